@@ -5,14 +5,23 @@ from domain.value_objects import CartItem, Money, Percentage
 class Discount:
     """Base class for cart item discounts with conditional eligibility.
 
+    Conditions are stored ordered by their ``estimated_selectivity`` so the most
+    selective ones are checked first. Conditions whose class does not define
+    it are treated as 1.0 and keep their relative order.
+
     Args:
         conditions: Optional list of conditions that must be met for discount eligibility.
     """
 
+    __slots__ = ("conditions",)
+
     def __init__(self, conditions: list[DiscountCondition] | None):
-        self.conditions = conditions or []
+        self.conditions = sorted(
+            conditions or [],
+            key=lambda c: getattr(type(c), "estimated_selectivity", 1.0),
+        )
 
-    def is_eligible(self, cart_item: CartItem):
+    def is_eligible(self, cart_item: CartItem) -> bool:
         """Check if cart item meets all discount conditions.
 
         Args:
@@ -21,7 +30,10 @@ class Discount:
         Returns:
             True if all conditions are met.
         """
-        return all([c.is_eligible(cart_item) for c in self.conditions])
+        for condition in self.conditions:
+            if not condition.is_eligible(cart_item):
+                return False
+        return True
 
     def calculate(self, cart_item: CartItem) -> Money | None:
         """Calculate discount amount if eligible and currency matches.
@@ -64,6 +76,8 @@ class AmountDiscount(Discount):
         conditions: Optional list of eligibility conditions.
     """
 
+    __slots__ = ("amount",)
+
     def __init__(self, amount: Money, conditions: list[DiscountCondition] | None):
         self.amount = amount
         super().__init__(conditions)
@@ -88,6 +102,8 @@ class PercentageDiscount(Discount):
         conditions: Optional list of eligibility conditions.
     """
 
+    __slots__ = ("percentage",)
+
     def __init__(
         self, percentage: Percentage, conditions: list[DiscountCondition] | None
     ):
@@ -1,8 +1,21 @@
+import sys
+from collections.abc import Set as AbstractSet
+
 from domain.value_objects import CartItem
 
 
 class DiscountCondition:
-    """Base class for discount eligibility conditions."""
+    """Base class for discount eligibility conditions.
+
+    Discounts evaluate their conditions in ascending ``estimated_selectivity``
+    order and stop at the first failing one, so conditions that are cheap and
+    reject most cart items should report a low value. Conditions with equal
+    selectivity keep their original order.
+    """
+
+    __slots__ = ()
+
+    estimated_selectivity: float = 1.0
 
     def is_eligible(self, cart_item: CartItem) -> bool:
         """Check if cart item meets the condition.
@@ -26,6 +39,10 @@ class MinQuantityDiscountCondition(DiscountCondition):
         min_quantity: Minimum required quantity.
     """
 
+    __slots__ = ("min_quantity",)
+
+    estimated_selectivity = 0.5
+
     def __init__(self, min_quantity: int):
         super().__init__()
         self.min_quantity = min_quantity
@@ -45,12 +62,19 @@ class MinQuantityDiscountCondition(DiscountCondition):
 class ProductCodeDiscountCondition(DiscountCondition):
     """Condition that checks if cart item product code is in allowed set.
 
+    Codes are stored as an interned frozenset so membership checks against
+    interned cart item codes resolve on identity.
+
     Args:
-        product_codes: Set of eligible product codes.
+        product_codes: Set or frozenset of eligible product codes.
     """
 
-    def __init__(self, product_codes: set[str]):
-        self.product_codes = product_codes
+    __slots__ = ("product_codes",)
+
+    estimated_selectivity = 0.1
+
+    def __init__(self, product_codes: AbstractSet[str]):
+        self.product_codes = frozenset(sys.intern(code) for code in product_codes)
         super().__init__()
 
     def is_eligible(self, cart_item: CartItem) -> bool:
@@ -0,0 +1,191 @@
+from collections.abc import Callable
+
+from domain.entities.discount import AmountDiscount, Discount, PercentageDiscount
+from domain.entities.discount_condition import (
+    MinQuantityDiscountCondition,
+    ProductCodeDiscountCondition,
+)
+
+AMOUNT = 0
+PERCENTAGE = 1
+
+Rule = tuple[int, int, str | None, int | None, frozenset[str] | None]
+
+
+def compile_rules(discounts: tuple[Discount, ...]) -> tuple[Rule, ...] | None:
+    """Flatten built-in discounts into plain integer rules.
+
+    Each rule is a ``(kind, value, currency, min_quantity, product_codes)``
+    tuple, where ``min_quantity`` and ``product_codes`` are None when the
+    discount has no such condition.
+
+    Args:
+        discounts: Discounts to compile.
+
+    Returns:
+        Compiled rules in discount order, or None if any discount or condition
+        is not a built-in type and has to be evaluated through its own methods.
+    """
+    rules = []
+    for discount in discounts:
+        if type(discount) is AmountDiscount:
+            kind, value, currency = (
+                AMOUNT,
+                discount.amount.amount,
+                discount.amount.currency,
+            )
+        elif type(discount) is PercentageDiscount:
+            kind, value, currency = PERCENTAGE, discount.percentage.percentage, None
+        else:
+            return None
+
+        min_quantity = None
+        product_codes = None
+        for condition in discount.conditions:
+            if type(condition) is MinQuantityDiscountCondition:
+                required = condition.min_quantity
+                min_quantity = (
+                    required if min_quantity is None else max(min_quantity, required)
+                )
+            elif type(condition) is ProductCodeDiscountCondition:
+                codes = condition.product_codes
+                product_codes = (
+                    codes if product_codes is None else product_codes & codes
+                )
+            else:
+                return None
+
+        rules.append((kind, value, currency, min_quantity, product_codes))
+    return tuple(rules)
+
+
+ItemRule = tuple[int, int | None]
+ItemRules = tuple[tuple[ItemRule, ...], tuple[ItemRule, ...]]
+Kernel = Callable[[int, int], int]
+RuleIndex = tuple[dict[str, Kernel], Kernel]
+
+
+def select_rules(rules: tuple[Rule, ...], currency: str, code: str | None) -> ItemRules:
+    """Select and order the rules that can apply to a currency and product code.
+
+    Amount rules denominated in ``currency`` and all percentage rules are
+    returned as two groups of ``(value, min_quantity)`` tuples, each sorted by
+    value in descending order. Within a group the first rule an item is
+    eligible for is therefore the most valuable one.
+
+    Args:
+        rules: Rules produced by compile_rules.
+        currency: Currency of the cart items.
+        code: Product code, or None to keep only rules open to any code.
+
+    Returns:
+        Tuple of (amount rules, percentage rules).
+    """
+    amount_rules = []
+    percentage_rules = []
+    for kind, value, rule_currency, min_quantity, product_codes in rules:
+        if product_codes is not None and code not in product_codes:
+            continue
+        if kind == AMOUNT:
+            if rule_currency == currency:
+                amount_rules.append((value, min_quantity))
+        else:
+            percentage_rules.append((value, min_quantity))
+
+    def by_value(rule: ItemRule) -> int:
+        return rule[0]
+
+    return (
+        tuple(sorted(amount_rules, key=by_value, reverse=True)),
+        tuple(sorted(percentage_rules, key=by_value, reverse=True)),
+    )
+
+
+def build_kernel(rules: ItemRules) -> Kernel:
+    """Generate a function specialised to one ordered rule table.
+
+    The rules are unrolled into straight-line code: amount rules become an
+    if/elif chain that stops at the first eligible rule, and percentage rules
+    return as soon as a rule applies or no remaining rule can beat the current
+    best. Rule values are bound as keyword-only defaults, so the generated
+    source contains only identifiers.
+
+    Args:
+        rules: Ordered rules for one currency and product code from select_rules.
+
+    Returns:
+        Function taking ``(price, quantity)`` and returning the best discount
+        amount, or 0 if no rule applies.
+    """
+    amount_rules, percentage_rules = rules
+    constants: dict[str, int] = {}
+    body = ["best = 0"]
+
+    branch = "if"
+    for i, (value, min_quantity) in enumerate(amount_rules):
+        constants[f"amount_{i}"] = value
+        if min_quantity is None:
+            if branch == "if":
+                body.append(f"best = amount_{i}")
+            else:
+                body += ["else:", f"    best = amount_{i}"]
+            break
+        constants[f"amount_min_{i}"] = min_quantity
+        body += [f"{branch} quantity >= amount_min_{i}:", f"    best = amount_{i}"]
+        branch = "elif"
+
+    for i, (value, min_quantity) in enumerate(percentage_rules):
+        constants[f"percentage_{i}"] = value
+        body += [
+            f"amount = price * percentage_{i} // 100",
+            "if amount <= best:",
+            "    return best",
+        ]
+        if min_quantity is None:
+            body.append("return amount")
+            break
+        constants[f"percentage_min_{i}"] = min_quantity
+        body += [f"if quantity >= percentage_min_{i}:", "    return amount"]
+    else:
+        body.append("return best")
+
+    defaults = "".join(f", {name}={name}" for name in constants)
+    signature = f"price, quantity, *{defaults}" if constants else "price, quantity"
+    source = f"def kernel({signature}):\n" + "".join(f"    {line}\n" for line in body)
+    namespace: dict[str, object] = dict(constants)
+    # The source is built only from fixed templates and generated identifiers;
+    # rule values reach the kernel as keyword-only defaults, never as code.
+    exec(compile(source, "<discount kernel>", "exec"), namespace)  # noqa: S102
+    return namespace["kernel"]  # type: ignore[return-value]
+
+
+def index_rules(rules: tuple[Rule, ...], currency: str) -> RuleIndex:
+    """Build specialised kernels for every product code the rules mention.
+
+    Product code eligibility is resolved once here for all conditions, so a
+    cart item only needs a single dict lookup instead of one set lookup per
+    product-code restricted rule. Codes with identical rule tables share one
+    kernel.
+
+    Args:
+        rules: Rules produced by compile_rules.
+        currency: Currency of the cart items.
+
+    Returns:
+        Tuple of (kernel per mentioned product code, kernel for any other code).
+    """
+    kernels: dict[ItemRules, Kernel] = {}
+
+    def kernel_for(code: str | None) -> Kernel:
+        item_rules = select_rules(rules, currency, code)
+        kernel = kernels.get(item_rules)
+        if kernel is None:
+            kernel = kernels[item_rules] = build_kernel(item_rules)
+        return kernel
+
+    codes: set[str] = set()
+    for rule in rules:
+        if rule[4] is not None:
+            codes |= rule[4]
+    by_code = {code: kernel_for(code) for code in codes}
+    return by_code, kernel_for(None)
@@ -1,7 +1,9 @@
+from collections import Counter
+
 from domain.entities.discount import Discount
 from domain.services.discount_resolver_service import (
-    DiscountResolverService,
     BestDiscountResolverService,
+    DiscountResolverService,
 )
 from domain.value_objects import CartItem, Money
 
@@ -21,16 +23,35 @@ class DiscountCalculatorService:
     ):
         self.discount_resolver_service = resolver_class(discounts)
 
-    def calculate_total_discount(self, cart_items: list[CartItem]) -> Money:
+    def calculate_total_discount(self, cart_items: list[CartItem]) -> Money | int:
         """Calculate the total discount for all cart items.
 
+        Identical cart lines (same code, price and quantity) are resolved once
+        and their discount is multiplied by the number of occurrences, so the
+        resolver must return the same discount for identical lines.
+
         Args:
             cart_items: List of items in the shopping cart.
 
         Returns:
-            Total discount amount across all items.
+            Total discount amount across all items, or 0 for an empty cart.
+
+        Raises:
+            ValueError: If cart items are priced in different currencies.
         """
-        discounts = [
-            self.discount_resolver_service.calculate_discount(c_i) for c_i in cart_items
-        ]
-        return sum(discounts)
+        lines = Counter(cart_items)
+        if not lines:
+            return 0
+
+        discounts = self.discount_resolver_service.calculate_discounts(list(lines))
+
+        currencies = {d.currency for d in discounts}
+        if len(currencies) > 1:
+            raise ValueError(
+                f"Cannot add Money with different currencies: {', '.join(sorted(currencies))}"
+            )
+        total = sum(
+            discount.amount * count
+            for discount, count in zip(discounts, lines.values())
+        )
+        return Money(total, currencies.pop())
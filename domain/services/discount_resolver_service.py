@@ -1,6 +1,129 @@
-from domain.entities.discount import Discount
+import logging
+from collections.abc import Iterable
+from itertools import chain
+
+from domain.entities.discount import AmountDiscount, Discount, PercentageDiscount
+from domain.entities.discount_condition import ProductCodeDiscountCondition
+from domain.services._discount_kernel import (
+    RuleIndex,
+    compile_rules,
+    index_rules,
+)
 from domain.value_objects import CartItem, Money
 
+logger = logging.getLogger(__name__)
+
+
+def _dominance_key(
+    discount: Discount,
+) -> tuple[tuple[type, str | None], float] | None:
+    """Return the comparison group and value of a built-in discount.
+
+    Args:
+        discount: Discount to classify.
+
+    Returns:
+        Tuple of ((type, currency), value), or None for other discount types.
+    """
+    if type(discount) is AmountDiscount:
+        return (AmountDiscount, discount.amount.currency), discount.amount.amount
+    if type(discount) is PercentageDiscount:
+        return (PercentageDiscount, None), discount.percentage.percentage
+    return None
+
+
+def _drop_dominated(discounts: tuple[Discount, ...]) -> tuple[Discount, ...]:
+    """Remove built-in discounts that can never be the best one.
+
+    An unconditional discount applies to every item, so any other discount of
+    the same type (and currency, for amount discounts) whose value does not
+    exceed it can never win. Only the first unconditional discount with the
+    highest value is kept in each group.
+
+    Args:
+        discounts: Discounts to filter.
+
+    Returns:
+        Remaining discounts in their original order.
+    """
+    best: dict[tuple[type, str | None], float] = {}
+    for discount in discounts:
+        key = _dominance_key(discount)
+        if key is not None and not discount.conditions:
+            group, value = key
+            if value > best.get(group, -1):
+                best[group] = value
+
+    kept = []
+    kept_unconditional: set[tuple[type, str | None]] = set()
+    for discount in discounts:
+        key = _dominance_key(discount)
+        if key is None:
+            kept.append(discount)
+            continue
+        group, value = key
+        best_value = best.get(group)
+        if best_value is None or value > best_value:
+            kept.append(discount)
+        elif (
+            value == best_value
+            and not discount.conditions
+            and group not in kept_unconditional
+        ):
+            # Later unconditional duplicates are dominated by this one.
+            kept.append(discount)
+            kept_unconditional.add(group)
+        else:
+            discount_type, currency = group
+            logger.debug(
+                "Dropping dominated %s of %s (currency: %s)",
+                discount_type.__name__,
+                value,
+                currency,
+            )
+    return tuple(kept)
+
+
+def _index_by_product_code(
+    discounts: tuple[Discount, ...],
+) -> tuple[tuple[Discount, ...], dict[str, tuple[Discount, ...]]]:
+    """Split discounts into unrestricted ones and ones limited to product codes.
+
+    A product code condition only restricts a discount whose conditions are
+    all required, so only discounts relying on the ``is_eligible`` and
+    ``calculate`` of Discount are indexed. Any other object implementing
+    ``calculate`` is treated as unrestricted and evaluated for every item.
+
+    Args:
+        discounts: Discounts to index.
+
+    Returns:
+        Tuple of (discounts open to any code, discounts per allowed product code).
+    """
+    unrestricted = []
+    by_code: dict[str, list[Discount]] = {}
+    for discount in discounts:
+        discount_type = type(discount)
+        if (
+            getattr(discount_type, "is_eligible", None) is not Discount.is_eligible
+            or getattr(discount_type, "calculate", None) is not Discount.calculate
+        ):
+            unrestricted.append(discount)
+            continue
+        codes = None
+        for condition in getattr(discount, "conditions", ()):
+            if type(condition) is ProductCodeDiscountCondition:
+                allowed = condition.product_codes
+                codes = allowed if codes is None else codes & allowed
+        if codes is None:
+            unrestricted.append(discount)
+        else:
+            for code in codes:
+                by_code.setdefault(code, []).append(discount)
+    return tuple(unrestricted), {
+        code: tuple(code_discounts) for code, code_discounts in by_code.items()
+    }
+
 
 class DiscountResolverService:
     """Base service for resolving and calculating discounts for cart items.
@@ -10,7 +133,7 @@ class DiscountResolverService:
     """
 
     def __init__(self, discounts: list[Discount]):
-        self.discounts = discounts
+        self.discounts = tuple(discounts)
 
     def calculate_discount(self, cart_item: CartItem) -> Money:
         """Calculate discount for a cart item, capped at total price.
@@ -22,11 +145,23 @@ class DiscountResolverService:
             Discount amount, never exceeding item's total price.
         """
         discount_value = self._calculate_discount(cart_item)
-        if discount_value.amount > cart_item.total_price.amount:
+        if discount_value.amount > cart_item.total_amount:
             return cart_item.total_price
 
         return discount_value
 
+    def calculate_discounts(self, cart_items: list[CartItem]) -> list[Money]:
+        """Calculate capped discounts for all cart items in a single pass.
+
+        Args:
+            cart_items: List of items in the shopping cart.
+
+        Returns:
+            Discount amount for each cart item, in cart order.
+        """
+        calculate_discount = self.calculate_discount
+        return [calculate_discount(cart_item) for cart_item in cart_items]
+
     def _calculate_discount(self, cart_item: CartItem) -> Money:
         """Calculate the discount value for a cart item.
 
@@ -43,7 +178,43 @@ class DiscountResolverService:
 
 
 class BestDiscountResolverService(DiscountResolverService):
-    """Resolver that applies the best (highest value) discount from available discounts."""
+    """Resolver that applies the best (highest value) discount from available discounts.
+
+    Resolved values are memoized per cart line (code, price and quantity) so
+    repeated cart lines are only evaluated once. Assigning ``discounts``
+    rebuilds the derived state and clears the cache, and discounts dominated
+    by an unconditional discount of the same kind are dropped up front.
+
+    When every remaining discount is a built-in type, they are compiled into
+    flat integer rules, and a function specialised to the rules applicable to
+    each currency and product code is generated once and reused for every
+    matching item. Otherwise discounts restricted to product codes are indexed
+    by code, so each item only evaluates the discounts that can apply to it.
+
+    Args:
+        discounts: List of available discount rules.
+    """
+
+    cache_size = 4096
+
+    @property
+    def discounts(self) -> tuple[Discount, ...]:
+        """Available discount rules."""
+        return self._discounts
+
+    @discounts.setter
+    def discounts(self, discounts: Iterable[Discount]) -> None:
+        """Replace the discount rules and rebuild everything derived from them.
+
+        Args:
+            discounts: New discount rules.
+        """
+        self._discounts = tuple(discounts)
+        self._cache: dict[CartItem, Money] = {}
+        candidates = _drop_dominated(self._discounts)
+        self._rules = compile_rules(candidates)
+        self._rule_index: dict[str, RuleIndex] = {}
+        self._unrestricted, self._by_code = _index_by_product_code(candidates)
 
     def _calculate_discount(self, cart_item: CartItem) -> Money:
         """Find and return the best discount value for a cart item.
@@ -54,9 +225,45 @@ class BestDiscountResolverService(DiscountResolverService):
         Returns:
             Highest discount amount from all eligible discounts.
         """
-        best_discount_value = Money(0.0, cart_item.price.currency)
-        for discount in self.discounts:
-            discount_value = discount.calculate(cart_item)
-            if discount_value and discount_value.amount > best_discount_value.amount:
-                best_discount_value = discount_value
+        cache = self._cache
+        cached = cache.get(cart_item)
+        if cached is not None:
+            return cached
+
+        best_discount_value = self._find_best_discount(cart_item)
+        if len(cache) >= self.cache_size:
+            # Evict the oldest entry to keep memory bounded.
+            del cache[next(iter(cache))]
+        cache[cart_item] = best_discount_value
         return best_discount_value
+
+    def _find_best_discount(self, cart_item: CartItem) -> Money:
+        """Evaluate all discounts and return the highest value.
+
+        Args:
+            cart_item: The cart item to calculate discount for.
+
+        Returns:
+            Highest discount amount from all eligible discounts.
+        """
+        if self._rules is not None:
+            price = cart_item.price
+            rule_index = self._rule_index.get(price.currency)
+            if rule_index is None:
+                rule_index = index_rules(self._rules, price.currency)
+                self._rule_index[price.currency] = rule_index
+            by_code, default_kernel = rule_index
+            kernel = by_code.get(cart_item.code, default_kernel)
+            amount = kernel(price.amount, cart_item.quantity)
+            return Money(amount, price.currency)
+
+        best_amount = 0
+        candidates = chain(self._unrestricted, self._by_code.get(cart_item.code, ()))
+        for discount in candidates:
+            discount_value = discount.calculate(cart_item)
+            if discount_value is not None:
+                amount = discount_value.amount
+                # A comparison is cheaper than a max() call in this hot loop.
+                if amount > best_amount:  # noqa: PLR1730
+                    best_amount = amount
+        return Money(best_amount, cart_item.price.currency)
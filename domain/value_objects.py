@@ -1,26 +1,50 @@
+import sys
+
+
 class Money:
     """Immutable value object representing a monetary amount with currency.
 
     Args:
         amount: The monetary amount.
-        currency: ISO currency code (e.g., "USD", "EUR").
+        currency: ISO currency code (e.g., "USD", "EUR"). Currency codes are
+            interned, so comparing the currencies of two Money objects is an
+            identity check.
     """
 
+    __slots__ = ("_amount", "_currency")
+
     def __init__(self, amount: int, currency: str):
-        self.__amount = amount
-        self.__currency = currency
+        self._amount = amount
+        self._currency = sys.intern(currency)
 
     @property
     def amount(self) -> int:
         """Get the monetary amount."""
-        return self.__amount
+        return self._amount
 
     @property
     def currency(self) -> str:
         """Get the currency code."""
-        return self.__currency
+        return self._currency
+
+    def __eq__(self, other: object) -> bool:
+        """Compare Money objects by amount and currency.
 
-    def __add__(self, other: "Money") -> "Money":
+        Args:
+            other: Object to compare with.
+
+        Returns:
+            True if both hold the same amount in the same currency.
+        """
+        if not isinstance(other, Money):
+            return NotImplemented
+        return self._amount == other._amount and self._currency == other._currency
+
+    def __hash__(self) -> int:
+        """Return a hash consistent with equality."""
+        return hash((self._amount, self._currency))
+
+    def __add__(self, other: object) -> "Money":
         """Add two Money objects. Only same currency allowed.
 
         Args:
@@ -34,13 +58,13 @@ class Money:
         """
         if not isinstance(other, Money):
             return NotImplemented
-        if self.__currency != other.__currency:
+        if self._currency != other._currency:
             raise ValueError(
-                f"Cannot add Money with different currencies: {self.__currency} and {other.__currency}"
+                f"Cannot add Money with different currencies: {self._currency} and {other._currency}"
             )
-        return Money(self.__amount + other.__amount, self.__currency)
+        return Money(self._amount + other._amount, self._currency)
 
-    def __radd__(self, other):
+    def __radd__(self, other: object) -> "Money":
         """Support sum() function with Money objects.
 
         Args:
@@ -65,49 +89,81 @@ class Percentage:
         ValueError: If percentage is outside 0-100 range.
     """
 
+    __slots__ = ("_percentage",)
+
     def __init__(self, percentage: int):
         if percentage < 0 or percentage > 100:
             raise ValueError(
                 f"percentage has to be a float value between 0 and 100 - not {percentage}"
             )
-        self.__percentage = percentage
+        self._percentage = percentage
 
     @property
     def percentage(self) -> int:
         """Get the percentage value."""
-        return self.__percentage
+        return self._percentage
 
 
 class CartItem:
     """Immutable value object representing a shopping cart item.
 
+    Cart items are equal, and hash equally, when their code, unit price,
+    currency and quantity match.
+
     Args:
         code: Product identifier code.
         price: Unit price of the product.
         quantity: Number of units in cart.
     """
 
+    __slots__ = ("_code", "_hash", "_key", "_price", "_quantity", "_total_price")
+
     def __init__(self, code: str, price: Money, quantity: int):
-        self.__code = code
-        self.__price = price
-        self.__quantity = quantity
+        self._code = sys.intern(code)
+        self._price = price
+        self._quantity = quantity
+        self._total_price = Money(quantity * price.amount, price.currency)
+        self._key = (self._code, price.amount, price.currency, quantity)
+        self._hash = hash(self._key)
 
     @property
     def code(self) -> str:
         """Get the product code."""
-        return self.__code
+        return self._code
 
     @property
     def price(self) -> Money:
         """Get the unit price."""
-        return self.__price
+        return self._price
 
     @property
     def quantity(self) -> int:
         """Get the quantity."""
-        return self.__quantity
+        return self._quantity
 
     @property
     def total_price(self) -> Money:
-        """Calculate the total price (quantity × unit price)."""
-        return Money(self.__quantity * self.__price.amount, self.__price.currency)
+        """Get the total price (quantity × unit price)."""
+        return self._total_price
+
+    @property
+    def total_amount(self) -> int:
+        """Get the total price amount (quantity × unit price) as a plain number."""
+        return self._total_price.amount
+
+    def __eq__(self, other: object) -> bool:
+        """Compare cart items by code, unit price and quantity.
+
+        Args:
+            other: Object to compare with.
+
+        Returns:
+            True if both items describe the same cart line.
+        """
+        if not isinstance(other, CartItem):
+            return NotImplemented
+        return self._key == other._key
+
+    def __hash__(self) -> int:
+        """Return the hash precomputed from code, unit price and quantity."""
+        return self._hash
@@ -1,5 +1,15 @@
+import functools
 import pytest
 from domain.value_objects import CartItem, Money, Percentage
+from tests.doubles import StubCondition, StubDiscount
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "unit: fast tests of a single component")
+    config.addinivalue_line("markers", "fast: microsecond-level value object tests")
+    config.addinivalue_line(
+        "markers", "integration: end-to-end scenarios across the whole system"
+    )
 
 
 @pytest.fixture
@@ -38,12 +48,6 @@ def percentage_50():
     return Percentage(50)
 
 
-@pytest.fixture
-def percentage_100():
-    """100% percentage."""
-    return Percentage(100)
-
-
 @pytest.fixture
 def cart_item_usd(usd_money):
     """Standard cart item with USD currency."""
@@ -63,6 +67,56 @@ def cart_item_multiple_quantity(usd_money):
 
 
 @pytest.fixture
-def cart_item_high_quantity():
-    """Cart item with high quantity."""
-    return CartItem("ITEM001", Money(50, "USD"), 5)
+def eligible_condition():
+    """Condition double that accepts every cart item."""
+    return StubCondition(True)
+
+
+@pytest.fixture
+def ineligible_condition():
+    """Condition double that rejects every cart item."""
+    return StubCondition(False)
+
+
+@pytest.fixture(scope="session")
+def item001_usd_100_q1():
+    """Shared ITEM001 cart item at 100 USD. Cart items are immutable."""
+    return CartItem("ITEM001", Money(100, "USD"), 1)
+
+
+@pytest.fixture(scope="session")
+def item002_usd_200_q1():
+    """Shared ITEM002 cart item at 200 USD."""
+    return CartItem("ITEM002", Money(200, "USD"), 1)
+
+
+@pytest.fixture(scope="session")
+def item003_usd_150_q1():
+    """Shared ITEM003 cart item at 150 USD."""
+    return CartItem("ITEM003", Money(150, "USD"), 1)
+
+
+@pytest.fixture(scope="session")
+def three_item_cart_usd(item001_usd_100_q1, item002_usd_200_q1, item003_usd_150_q1):
+    """Shared USD cart of three single items. Tests must not mutate it."""
+    return [item001_usd_100_q1, item002_usd_200_q1, item003_usd_150_q1]
+
+
+@pytest.fixture
+def make_discount():
+    """Factory for discount stubs returning a fixed amount, or None if not given."""
+
+    def _make_discount(amount=None, currency="USD"):
+        result = None if amount is None else Money(amount, currency)
+        return StubDiscount(result)
+
+    return _make_discount
+
+
+@pytest.fixture(scope="session")
+def money():
+    """Factory returning one shared Money instance per amount and currency.
+
+    Money is immutable, so instances can be reused across the whole session.
+    """
+    return functools.lru_cache(maxsize=None)(Money)
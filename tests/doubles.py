@@ -0,0 +1,57 @@
+from domain.entities.discount import Discount
+from domain.entities.discount_condition import DiscountCondition
+from domain.value_objects import CartItem, Money
+
+
+class StubDiscount(Discount):
+    """Discount double with a fixed result that records calculated cart items.
+
+    Args:
+        result: Value returned by calculate.
+    """
+
+    __slots__ = ("calls", "result")
+
+    def __init__(self, result: Money | None):
+        super().__init__(None)
+        self.result = result
+        self.calls: list[CartItem] = []
+
+    def calculate(self, cart_item: CartItem) -> Money | None:
+        self.calls.append(cart_item)
+        return self.result
+
+
+class TableDiscount(Discount):
+    """Discount double replaying recorded results per cart item.
+
+    Args:
+        table: Result to return for each cart item; other items get None.
+    """
+
+    __slots__ = ("calls", "table")
+
+    def __init__(self, table: dict[CartItem, Money | None]):
+        super().__init__(None)
+        self.table = table
+        self.calls: list[CartItem] = []
+
+    def calculate(self, cart_item: CartItem) -> Money | None:
+        self.calls.append(cart_item)
+        return self.table.get(cart_item)
+
+
+class StubCondition(DiscountCondition):
+    """Condition double with a fixed result that records checked cart items.
+
+    Args:
+        eligible: Result returned by is_eligible.
+    """
+
+    def __init__(self, eligible: bool):
+        self.eligible = eligible
+        self.calls: list[CartItem] = []
+
+    def is_eligible(self, cart_item: CartItem) -> bool:
+        self.calls.append(cart_item)
+        return self.eligible
@@ -1,8 +1,15 @@
 import pytest
 from unittest.mock import Mock
 from domain.entities.discount import Discount, AmountDiscount, PercentageDiscount
-from domain.entities.discount_condition import DiscountCondition
+from domain.entities.discount_condition import (
+    DiscountCondition,
+    MinQuantityDiscountCondition,
+    ProductCodeDiscountCondition,
+)
 from domain.value_objects import CartItem, Money, Percentage
+from tests.doubles import StubCondition
+
+pytestmark = [pytest.mark.unit, pytest.mark.filterwarnings("error")]
 
 
 class TestDiscount:
@@ -26,6 +33,17 @@ class TestDiscount:
 
     def test_is_eligible_with_all_conditions_met(self, cart_item_usd):
         """Test eligibility when all conditions are met."""
+        condition1 = StubCondition(True)
+        condition2 = StubCondition(True)
+
+        discount = Discount(conditions=[condition1, condition2])
+
+        assert discount.is_eligible(cart_item_usd) is True
+        assert condition1.calls == [cart_item_usd]
+        assert condition2.calls == [cart_item_usd]
+
+    def test_is_eligible_with_mock_conditions(self, cart_item_usd):
+        """Test that conditions without a selectivity estimate are still accepted."""
         mock_condition1 = Mock(spec=DiscountCondition)
         mock_condition1.is_eligible.return_value = True
         mock_condition2 = Mock(spec=DiscountCondition)
@@ -37,25 +55,53 @@ class TestDiscount:
         mock_condition1.is_eligible.assert_called_once_with(cart_item_usd)
         mock_condition2.is_eligible.assert_called_once_with(cart_item_usd)
 
-    def test_not_eligible_when_one_condition_fails(self, cart_item_usd):
+    def test_duck_typed_conditions_keep_their_order(self, cart_item_usd):
+        """Test that conditions outside the DiscountCondition hierarchy are accepted."""
+
+        class AlwaysTrue:
+            def is_eligible(self, cart_item):
+                return True
+
+        first, second = AlwaysTrue(), AlwaysTrue()
+
+        discount = Discount(conditions=[first, second])
+
+        assert discount.conditions == [first, second]
+        assert discount.is_eligible(cart_item_usd) is True
+
+    def test_not_eligible_when_one_condition_fails(
+        self, cart_item_usd, eligible_condition, ineligible_condition
+    ):
         """Test not eligible when one condition fails."""
-        mock_condition1 = Mock(spec=DiscountCondition)
-        mock_condition1.is_eligible.return_value = True
-        mock_condition2 = Mock(spec=DiscountCondition)
-        mock_condition2.is_eligible.return_value = False
+        discount = Discount(conditions=[eligible_condition, ineligible_condition])
 
-        discount = Discount(conditions=[mock_condition1, mock_condition2])
+        assert discount.is_eligible(cart_item_usd) is False
+
+    def test_short_circuit_stops_on_first_false(self, cart_item_usd):
+        """Test that conditions after the first failing one are not evaluated."""
+        failing = StubCondition(False)
+        passing = StubCondition(True)
+
+        discount = Discount(conditions=[failing, passing])
 
         assert discount.is_eligible(cart_item_usd) is False
+        assert len(failing.calls) == 1
+        assert passing.calls == []
+
+    def test_conditions_ordered_by_estimated_selectivity(self):
+        """Test that the most selective conditions are evaluated first."""
+        quantity_condition = MinQuantityDiscountCondition(min_quantity=5)
+        product_condition = ProductCodeDiscountCondition({"ITEM001"})
+
+        discount = Discount(conditions=[quantity_condition, product_condition])
+
+        assert discount.conditions == [product_condition, quantity_condition]
 
     def test_calculate_returns_none_when_not_eligible(
-        self, cart_item_usd, small_usd_money
+        self, cart_item_usd, small_usd_money, ineligible_condition
     ):
         """Test calculate returns None when cart item is not eligible."""
-        mock_condition = Mock(spec=DiscountCondition)
-        mock_condition.is_eligible.return_value = False
-
-        discount = AmountDiscount(small_usd_money, conditions=[mock_condition])
+        discount = AmountDiscount(small_usd_money, conditions=[ineligible_condition])
 
         result = discount.calculate(cart_item_usd)
         assert result is None
@@ -69,43 +115,73 @@ class TestDiscount:
         result = discount.calculate(cart_item_usd)
         assert result is None
 
+    def test_calculate_returns_none_when_subclass_currency_mismatch(
+        self, cart_item_usd
+    ):
+        """Test that base calculate rejects amounts in another currency."""
+
+        class EuroDiscount(Discount):
+            def _calculate(self, cart_item):
+                return Money(10, "EUR")
+
+        assert EuroDiscount(conditions=None).calculate(cart_item_usd) is None
+
+    def test_base_calculate_returns_subclass_amount(
+        self, cart_item_usd, eligible_condition
+    ):
+        """Test that base calculate returns an amount in the item currency."""
+
+        class FlatDiscount(Discount):
+            def _calculate(self, cart_item):
+                return Money(10, "USD")
+
+        result = FlatDiscount(conditions=[eligible_condition]).calculate(cart_item_usd)
+
+        assert result == Money(10, "USD")
+
+    def test_base_calculate_returns_none_when_not_eligible(
+        self, cart_item_usd, ineligible_condition
+    ):
+        """Test that base calculate skips ineligible items."""
+
+        class FlatDiscount(Discount):
+            def _calculate(self, cart_item):
+                return Money(10, "USD")
+
+        discount = FlatDiscount(conditions=[ineligible_condition])
+
+        assert discount.calculate(cart_item_usd) is None
+
 
 class TestAmountDiscount:
     """Test AmountDiscount class."""
 
-    def test_create_amount_discount(self, small_usd_money):
-        """Test creating an AmountDiscount."""
-        discount = AmountDiscount(small_usd_money, conditions=None)
-        assert discount.amount.amount == 10
-        assert discount.amount.currency == "USD"
+    @pytest.mark.parametrize("amount,currency", [(10, "USD"), (15, "EUR")])
+    def test_calculate_returns_fixed_amount(self, amount, currency):
+        """Test that calculate returns the fixed amount in its currency."""
+        discount = AmountDiscount(Money(amount, currency), conditions=None)
+        cart_item = CartItem("ITEM001", Money(100, currency), 1)
 
-    def test_calculate_returns_fixed_amount(self, cart_item_usd, small_usd_money):
-        """Test that calculate returns fixed amount."""
-        discount = AmountDiscount(small_usd_money, conditions=None)
-
-        result = discount.calculate(cart_item_usd)
-        assert result.amount == 10
-        assert result.currency == "USD"
+        result = discount.calculate(cart_item)
+        assert discount.amount.amount == amount
+        assert result.amount == amount
+        assert result.currency == currency
 
-    def test_calculate_with_conditions_met(self, cart_item_usd):
+    def test_calculate_with_conditions_met(self, cart_item_usd, eligible_condition):
         """Test calculate when conditions are met."""
-        mock_condition = Mock(spec=DiscountCondition)
-        mock_condition.is_eligible.return_value = True
-
         amount = Money(15, "USD")
-        discount = AmountDiscount(amount, conditions=[mock_condition])
+        discount = AmountDiscount(amount, conditions=[eligible_condition])
 
         result = discount.calculate(cart_item_usd)
         assert result.amount == 15
         assert result.currency == "USD"
 
-    def test_calculate_with_conditions_not_met(self, cart_item_usd):
+    def test_calculate_with_conditions_not_met(
+        self, cart_item_usd, ineligible_condition
+    ):
         """Test calculate returns None when conditions not met."""
-        mock_condition = Mock(spec=DiscountCondition)
-        mock_condition.is_eligible.return_value = False
-
         amount = Money(15, "USD")
-        discount = AmountDiscount(amount, conditions=[mock_condition])
+        discount = AmountDiscount(amount, conditions=[ineligible_condition])
 
         result = discount.calculate(cart_item_usd)
         assert result is None
@@ -119,67 +195,41 @@ class TestPercentageDiscount:
         discount = PercentageDiscount(percentage_10, conditions=None)
         assert discount.percentage.percentage == 10
 
-    def test_calculate_percentage_discount(self, cart_item_usd, percentage_10):
-        """Test calculating percentage discount."""
-        discount = PercentageDiscount(percentage_10, conditions=None)
-
-        result = discount.calculate(cart_item_usd)
-        assert result.amount == 10
-        assert result.currency == "USD"
-
-    def test_calculate_percentage_discount_rounds_down(self):
-        """Test that percentage calculation rounds down."""
-        percentage = Percentage(15)
-        discount = PercentageDiscount(percentage, conditions=None)
-        cart_item = CartItem("ITEM001", Money(99, "USD"), 1)
+    @pytest.mark.parametrize(
+        "percentage,price,currency,expected",
+        [
+            (10, 100, "USD", 10),
+            (15, 99, "USD", 14),  # 99 * 15 / 100 = 14.85, rounds down to 14
+            (50, 200, "USD", 100),
+            (100, 150, "USD", 150),
+            (1, 100, "USD", 1),  # exact, no fixed-point truncation
+            (0, 100, "USD", 0),
+            (25, 80, "EUR", 20),
+        ],
+    )
+    def test_calculate_percentage_discount(self, percentage, price, currency, expected):
+        """Test percentage discount amounts round down and keep the item currency."""
+        discount = PercentageDiscount(Percentage(percentage), conditions=None)
+        cart_item = CartItem("ITEM001", Money(price, currency), 1)
 
         result = discount.calculate(cart_item)
-        assert result.amount == 14  # 99 * 15 / 100 = 14.85, rounds down to 14
+        assert result.amount == expected
+        assert result.currency == currency
 
-    def test_calculate_50_percent_discount(self, percentage_50):
-        """Test 50% discount calculation."""
-        discount = PercentageDiscount(percentage_50, conditions=None)
-        cart_item = CartItem("ITEM001", Money(200, "USD"), 1)
-
-        result = discount.calculate(cart_item)
-        assert result.amount == 100
-        assert result.currency == "USD"
-
-    def test_calculate_100_percent_discount(self, percentage_100):
-        """Test 100% discount calculation."""
-        discount = PercentageDiscount(percentage_100, conditions=None)
-        cart_item = CartItem("ITEM001", Money(150, "USD"), 1)
-
-        result = discount.calculate(cart_item)
-        assert result.amount == 150
-        assert result.currency == "USD"
-
-    def test_calculate_zero_percent_discount(self, cart_item_usd):
-        """Test 0% discount calculation."""
-        percentage = Percentage(0)
-        discount = PercentageDiscount(percentage, conditions=None)
-
-        result = discount.calculate(cart_item_usd)
-        assert result.amount == 0
-        assert result.currency == "USD"
-
-    def test_calculate_with_conditions_met(self, cart_item_usd, percentage_20):
+    def test_calculate_with_conditions_met(
+        self, cart_item_usd, percentage_20, eligible_condition
+    ):
         """Test calculate when conditions are met."""
-        mock_condition = Mock(spec=DiscountCondition)
-        mock_condition.is_eligible.return_value = True
-
-        discount = PercentageDiscount(percentage_20, conditions=[mock_condition])
+        discount = PercentageDiscount(percentage_20, conditions=[eligible_condition])
 
         result = discount.calculate(cart_item_usd)
         assert result.amount == 20
         assert result.currency == "USD"
 
-    def test_calculate_preserves_currency(self):
-        """Test that percentage discount preserves currency."""
-        percentage = Percentage(25)
-        discount = PercentageDiscount(percentage, conditions=None)
-        cart_item = CartItem("ITEM001", Money(80, "EUR"), 1)
+    def test_calculate_with_conditions_not_met(
+        self, cart_item_usd, percentage_20, ineligible_condition
+    ):
+        """Test calculate returns None when conditions not met."""
+        discount = PercentageDiscount(percentage_20, conditions=[ineligible_condition])
 
-        result = discount.calculate(cart_item)
-        assert result.amount == 20
-        assert result.currency == "EUR"
+        assert discount.calculate(cart_item_usd) is None
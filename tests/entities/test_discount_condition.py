@@ -1,3 +1,4 @@
+import sys
 import pytest
 from domain.entities.discount_condition import (
     DiscountCondition,
@@ -6,6 +7,11 @@ from domain.entities.discount_condition import (
 )
 from domain.value_objects import CartItem, Money
 
+pytestmark = pytest.mark.unit
+
+MIN3 = MinQuantityDiscountCondition(min_quantity=3)
+ALLOWED = ProductCodeDiscountCondition(frozenset({"ITEM001", "ITEM002", "ITEM003"}))
+
 
 class TestDiscountCondition:
     """Test base DiscountCondition class."""
@@ -20,21 +26,11 @@ class TestDiscountCondition:
 class TestMinQuantityDiscountCondition:
     """Test MinQuantityDiscountCondition."""
 
-    def test_eligible_when_quantity_meets_minimum(self, cart_item_multiple_quantity):
-        """Test eligibility when quantity meets minimum."""
-        condition = MinQuantityDiscountCondition(min_quantity=3)
-        assert condition.is_eligible(cart_item_multiple_quantity) is True
-
-    def test_eligible_when_quantity_exceeds_minimum(self, cart_item_high_quantity):
-        """Test eligibility when quantity exceeds minimum."""
-        condition = MinQuantityDiscountCondition(min_quantity=3)
-        assert condition.is_eligible(cart_item_high_quantity) is True
-
-    def test_not_eligible_when_quantity_below_minimum(self):
-        """Test not eligible when quantity is below minimum."""
-        condition = MinQuantityDiscountCondition(min_quantity=3)
-        cart_item = CartItem("ITEM001", Money(100, "USD"), 2)
-        assert condition.is_eligible(cart_item) is False
+    @pytest.mark.parametrize("quantity,expected", [(3, True), (5, True), (2, False)])
+    def test_eligibility_against_minimum(self, quantity, expected):
+        """Test that quantities at or above the minimum are eligible."""
+        cart_item = CartItem("ITEM001", Money(100, "USD"), quantity)
+        assert MIN3.is_eligible(cart_item) is expected
 
 
 class TestProductCodeDiscountCondition:
@@ -42,14 +38,12 @@ class TestProductCodeDiscountCondition:
 
     def test_eligible_when_code_in_set(self, cart_item_usd):
         """Test eligibility when product code is in allowed set."""
-        condition = ProductCodeDiscountCondition({"ITEM001", "ITEM002", "ITEM003"})
-        assert condition.is_eligible(cart_item_usd) is True
+        assert ALLOWED.is_eligible(cart_item_usd) is True
 
     def test_not_eligible_when_code_not_in_set(self):
         """Test not eligible when product code is not in allowed set."""
-        condition = ProductCodeDiscountCondition({"ITEM001", "ITEM002", "ITEM003"})
         cart_item = CartItem("ITEM999", Money(100, "USD"), 1)
-        assert condition.is_eligible(cart_item) is False
+        assert ALLOWED.is_eligible(cart_item) is False
 
     def test_eligible_with_single_code(self, cart_item_usd):
         """Test eligibility with single product code in set."""
@@ -66,3 +60,12 @@ class TestProductCodeDiscountCondition:
         condition = ProductCodeDiscountCondition({"ITEM001"})
         cart_item = CartItem("item001", Money(100, "USD"), 1)
         assert condition.is_eligible(cart_item) is False
+
+    def test_product_codes_stored_as_frozenset(self):
+        """Test that allowed codes are frozen and interned."""
+        code = b"ITEM001".decode()
+        condition = ProductCodeDiscountCondition({code})
+
+        assert condition.product_codes == frozenset({"ITEM001"})
+        assert isinstance(condition.product_codes, frozenset)
+        assert next(iter(condition.product_codes)) is sys.intern("ITEM001")
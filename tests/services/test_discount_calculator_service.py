@@ -1,9 +1,32 @@
+import pytest
+
 from domain.entities.discount import AmountDiscount
 from domain.entities.discount_condition import ProductCodeDiscountCondition
 from domain.services.calculator_service import DiscountCalculatorService
 from domain.services.discount_resolver_service import DiscountResolverService
 from domain.value_objects import CartItem, Money
 
+pytestmark = pytest.mark.unit
+
+ITEM001_ONLY = ProductCodeDiscountCondition(frozenset({"ITEM001"}))
+ITEM002_ONLY = ProductCodeDiscountCondition(frozenset({"ITEM002"}))
+ITEM003_ONLY = ProductCodeDiscountCondition(frozenset({"ITEM003"}))
+ITEM999_ONLY = ProductCodeDiscountCondition(frozenset({"ITEM999"}))
+
+
+class FakeResolver(DiscountResolverService):
+    """Resolver double returning a fixed discount and recording resolved items."""
+
+    amount = 10
+
+    def __init__(self, discounts):
+        super().__init__(discounts)
+        self.calls = []
+
+    def _calculate_discount(self, cart_item: CartItem) -> Money:
+        self.calls.append(cart_item)
+        return Money(self.amount, cart_item.price.currency)
+
 
 class TestDiscountCalculatorService:
     """Test DiscountCalculatorService class."""
@@ -23,55 +46,37 @@ class TestDiscountCalculatorService:
 
         assert result == 0
 
-    def test_calculate_total_discount_with_single_item(self):
+    def test_calculate_total_discount_with_single_item(self, item001_usd_100_q1):
         """Test calculating total discount with single cart item."""
         discount = AmountDiscount(Money(10, "USD"), conditions=None)
         service = DiscountCalculatorService([discount])
-        cart_item = CartItem("ITEM001", Money(100, "USD"), 1)
 
-        result = service.calculate_total_discount([cart_item])
+        result = service.calculate_total_discount([item001_usd_100_q1])
 
         assert result.amount == 10
         assert result.currency == "USD"
 
-    def test_calculate_total_discount_with_multiple_items(self):
+    def test_calculate_total_discount_with_multiple_items(self, three_item_cart_usd):
         """Test calculating total discount with multiple cart items."""
         # Different discounts for different items
-        discount1 = AmountDiscount(
-            Money(10, "USD"), conditions=[ProductCodeDiscountCondition({"ITEM001"})]
-        )
-        discount2 = AmountDiscount(
-            Money(20, "USD"), conditions=[ProductCodeDiscountCondition({"ITEM002"})]
-        )
-        discount3 = AmountDiscount(
-            Money(15, "USD"), conditions=[ProductCodeDiscountCondition({"ITEM003"})]
-        )
+        discount1 = AmountDiscount(Money(10, "USD"), conditions=[ITEM001_ONLY])
+        discount2 = AmountDiscount(Money(20, "USD"), conditions=[ITEM002_ONLY])
+        discount3 = AmountDiscount(Money(15, "USD"), conditions=[ITEM003_ONLY])
 
         service = DiscountCalculatorService([discount1, discount2, discount3])
-        cart_items = [
-            CartItem("ITEM001", Money(100, "USD"), 1),
-            CartItem("ITEM002", Money(200, "USD"), 1),
-            CartItem("ITEM003", Money(150, "USD"), 1),
-        ]
 
-        result = service.calculate_total_discount(cart_items)
+        result = service.calculate_total_discount(three_item_cart_usd)
 
         assert result.amount == 45  # 10 + 20 + 15
         assert result.currency == "USD"
 
-    def test_calculate_total_discount_with_zero_discounts(self):
+    def test_calculate_total_discount_with_zero_discounts(self, three_item_cart_usd):
         """Test calculating when all items have zero discount."""
         # Discount that doesn't match any items
-        discount = AmountDiscount(
-            Money(10, "USD"), conditions=[ProductCodeDiscountCondition({"ITEM999"})]
-        )
+        discount = AmountDiscount(Money(10, "USD"), conditions=[ITEM999_ONLY])
         service = DiscountCalculatorService([discount])
-        cart_items = [
-            CartItem("ITEM001", Money(100, "USD"), 1),
-            CartItem("ITEM002", Money(200, "USD"), 1),
-        ]
 
-        result = service.calculate_total_discount(cart_items)
+        result = service.calculate_total_discount(three_item_cart_usd)
 
         assert result.amount == 0
         assert result.currency == "USD"
@@ -105,14 +110,24 @@ class TestDiscountCalculatorService:
         assert result.amount == 20
         assert result.currency == "EUR"
 
+    def test_calculate_total_discount_with_mixed_currencies_raises_error(self):
+        """Test that a cart priced in several currencies cannot be totalled."""
+        discount = AmountDiscount(Money(10, "USD"), conditions=None)
+        service = DiscountCalculatorService([discount])
+        cart_items = [
+            CartItem("ITEM001", Money(100, "USD"), 1),
+            CartItem("ITEM002", Money(200, "EUR"), 1),
+        ]
+
+        with pytest.raises(
+            ValueError, match="Cannot add Money with different currencies"
+        ):
+            service.calculate_total_discount(cart_items)
+
     def test_calculate_total_discount_with_varying_quantities(self):
         """Test calculating discount with items of varying quantities."""
-        discount1 = AmountDiscount(
-            Money(5, "USD"), conditions=[ProductCodeDiscountCondition({"ITEM001"})]
-        )
-        discount2 = AmountDiscount(
-            Money(10, "USD"), conditions=[ProductCodeDiscountCondition({"ITEM002"})]
-        )
+        discount1 = AmountDiscount(Money(5, "USD"), conditions=[ITEM001_ONLY])
+        discount2 = AmountDiscount(Money(10, "USD"), conditions=[ITEM002_ONLY])
 
         service = DiscountCalculatorService([discount1, discount2])
         cart_items = [
@@ -125,19 +140,35 @@ class TestDiscountCalculatorService:
         assert result.amount == 15  # 5 + 10
         assert result.currency == "USD"
 
-    def test_custom_resolver_class(self):
+    def test_identical_lines_are_resolved_once(self):
+        """Test that duplicate cart lines are resolved once and counted."""
+        service = DiscountCalculatorService([], resolver_class=FakeResolver)
+        cart_items = [
+            CartItem("ITEM001", Money(100, "USD"), 1),
+            CartItem("ITEM001", Money(100, "USD"), 1),
+            CartItem("ITEM001", Money(100, "USD"), 2),
+            CartItem("ITEM001", Money(100, "USD"), 1),
+        ]
+
+        result = service.calculate_total_discount(cart_items)
+
+        assert result.amount == 40  # 4 lines x 10
+        assert service.discount_resolver_service.calls == [
+            cart_items[0],
+            cart_items[2],
+        ]
+
+    def test_custom_resolver_class(self, item002_usd_200_q1):
         """Test that service accepts custom resolver_class."""
 
         # Create a custom resolver class that returns a fixed discount
-        class CustomResolver(DiscountResolverService):
-            def _calculate_discount(self, cart_item: CartItem) -> Money:
-                return Money(100, cart_item.price.currency)
+        class CustomResolver(FakeResolver):
+            amount = 100
 
         discount = AmountDiscount(Money(10, "USD"), conditions=None)
         service = DiscountCalculatorService([discount], resolver_class=CustomResolver)
 
-        cart_item = CartItem("ITEM001", Money(200, "USD"), 1)
-        result = service.calculate_total_discount([cart_item])
+        result = service.calculate_total_discount([item002_usd_200_q1])
 
         # Custom resolver always returns 100, not the discount amount
         assert result.amount == 100
@@ -0,0 +1,218 @@
+import pytest
+
+from domain.entities.discount import AmountDiscount, Discount, PercentageDiscount
+from domain.entities.discount_condition import (
+    DiscountCondition,
+    MinQuantityDiscountCondition,
+    ProductCodeDiscountCondition,
+)
+from domain.services._discount_kernel import (
+    AMOUNT,
+    PERCENTAGE,
+    build_kernel,
+    compile_rules,
+    index_rules,
+    select_rules,
+)
+from domain.value_objects import Money, Percentage
+
+pytestmark = pytest.mark.unit
+
+
+class TestCompileRules:
+    """Test compilation of discounts into flat rules."""
+
+    def test_compile_amount_discount(self):
+        """Test that an unconditional AmountDiscount becomes an amount rule."""
+        discount = AmountDiscount(Money(10, "USD"), conditions=None)
+
+        assert compile_rules((discount,)) == ((AMOUNT, 10, "USD", None, None),)
+
+    def test_compile_percentage_discount(self):
+        """Test that a PercentageDiscount becomes a currency-free rule."""
+        discount = PercentageDiscount(Percentage(20), conditions=None)
+
+        assert compile_rules((discount,)) == ((PERCENTAGE, 20, None, None, None),)
+
+    def test_compile_conditions(self):
+        """Test that conditions are folded into min quantity and code set."""
+        discount = AmountDiscount(
+            Money(10, "USD"),
+            conditions=[
+                MinQuantityDiscountCondition(3),
+                MinQuantityDiscountCondition(5),
+                ProductCodeDiscountCondition({"ITEM001", "ITEM002"}),
+                ProductCodeDiscountCondition({"ITEM002", "ITEM003"}),
+            ],
+        )
+
+        rules = compile_rules((discount,))
+
+        assert rules == ((AMOUNT, 10, "USD", 5, frozenset({"ITEM002"})),)
+
+    def test_custom_discount_is_not_compiled(self):
+        """Test that unknown discount types disable compilation."""
+
+        class CustomDiscount(Discount):
+            def _calculate(self, cart_item):
+                return Money(1, cart_item.price.currency)
+
+        discount = CustomDiscount(conditions=None)
+
+        assert compile_rules((discount,)) is None
+
+    def test_custom_condition_is_not_compiled(self):
+        """Test that unknown condition types disable compilation."""
+
+        class CustomCondition(DiscountCondition):
+            def is_eligible(self, cart_item):
+                return True
+
+        discount = AmountDiscount(Money(10, "USD"), conditions=[CustomCondition()])
+
+        assert compile_rules((discount,)) is None
+
+
+class TestSelectRules:
+    """Test rule selection for a currency and product code."""
+
+    def test_keeps_percentage_and_matching_amount_kernel(self):
+        """Test that only rules usable in the currency are kept."""
+        rules = select_rules(
+            (
+                (AMOUNT, 10, "USD", None, None),
+                (AMOUNT, 10, "EUR", None, None),
+                (PERCENTAGE, 20, None, None, None),
+            ),
+            "USD",
+            "ITEM001",
+        )
+
+        assert rules == (((10, None),), ((20, None),))
+
+    def test_keeps_rules_for_matching_product_code(self):
+        """Test that product code restricted rules are filtered by code."""
+        rules = (
+            (AMOUNT, 10, "USD", None, frozenset({"ITEM001"})),
+            (PERCENTAGE, 20, None, None, frozenset({"ITEM002"})),
+        )
+
+        assert select_rules(rules, "USD", "ITEM001") == (((10, None),), ())
+        assert select_rules(rules, "USD", None) == ((), ())
+
+    def test_orders_rules_by_value_descending(self):
+        """Test that the most valuable rules come first in each group."""
+        rules = select_rules(
+            (
+                (AMOUNT, 10, "USD", None, None),
+                (PERCENTAGE, 5, None, None, None),
+                (AMOUNT, 30, "USD", 2, None),
+                (PERCENTAGE, 15, None, None, None),
+            ),
+            "USD",
+            None,
+        )
+
+        assert rules == (((30, 2), (10, None)), ((15, None), (5, None)))
+
+
+class TestIndexRules:
+    """Test the per product code rule index."""
+
+    def test_indexes_mentioned_codes(self):
+        """Test that each mentioned code gets its own kernel."""
+        rules = (
+            (AMOUNT, 10, "USD", None, None),
+            (AMOUNT, 30, "USD", None, frozenset({"ITEM001", "ITEM002"})),
+            (PERCENTAGE, 50, None, None, frozenset({"ITEM002"})),
+        )
+
+        by_code, default_kernel = index_rules(rules, "USD")
+
+        assert set(by_code) == {"ITEM001", "ITEM002"}
+        assert by_code["ITEM001"](100, 1) == 30
+        assert by_code["ITEM002"](100, 1) == 50
+        assert default_kernel(100, 1) == 10
+
+    def test_identical_tables_share_a_kernel(self):
+        """Test that codes with the same rules reuse one generated kernel."""
+        rules = (
+            (AMOUNT, 10, "USD", None, None),
+            (AMOUNT, 30, "EUR", None, frozenset({"ITEM001"})),
+        )
+
+        by_code, default_kernel = index_rules(rules, "USD")
+
+        assert by_code["ITEM001"] is default_kernel
+
+
+def _kernel(*rules):
+    return build_kernel(select_rules(rules, "USD", "ITEM001"))
+
+
+class TestBuildKernel:
+    """Test the generated rule evaluation kernels."""
+
+    def test_no_rules_returns_zero(self):
+        """Test that no rules yield no discount."""
+        assert _kernel()(100, 1) == 0
+
+    def test_selects_highest_rule(self):
+        """Test that the highest applicable amount wins."""
+        kernel = _kernel(
+            (AMOUNT, 10, "USD", None, None),
+            (PERCENTAGE, 25, None, None, None),
+        )
+
+        assert kernel(100, 1) == 25
+
+    def test_amount_beats_percentage(self):
+        """Test that percentage rules that cannot beat the best are skipped."""
+        kernel = _kernel(
+            (AMOUNT, 30, "USD", None, None),
+            (PERCENTAGE, 25, None, None, None),
+        )
+
+        assert kernel(100, 1) == 30
+
+    def test_falls_through_to_next_eligible_rule(self):
+        """Test that ineligible top rules do not stop the scan."""
+        kernel = _kernel(
+            (AMOUNT, 50, "USD", 5, None),
+            (AMOUNT, 20, "USD", None, None),
+            (PERCENTAGE, 40, None, 5, None),
+            (PERCENTAGE, 30, None, None, None),
+        )
+
+        assert kernel(100, 1) == 30
+
+    def test_skips_rule_below_min_quantity(self):
+        """Test that min quantity is enforced."""
+        kernel = _kernel((AMOUNT, 10, "USD", 3, None))
+
+        assert kernel(100, 2) == 0
+
+    def test_percentage_rounds_down(self):
+        """Test that percentage rules round down like PercentageDiscount."""
+        kernel = _kernel((PERCENTAGE, 15, None, None, None))
+
+        assert kernel(99, 1) == 14
+
+    def test_unconditional_rule_ends_amount_chain(self):
+        """Test that an unconditional amount rule catches every quantity."""
+        kernel = _kernel(
+            (AMOUNT, 50, "USD", 5, None),
+            (AMOUNT, 20, "USD", None, None),
+            (AMOUNT, 10, "USD", None, None),
+        )
+
+        assert kernel(100, 5) == 50
+        assert kernel(100, 1) == 20
+
+    def test_percentage_matches_integer_division(self):
+        """Test that percentage rules agree exactly with price * pct // 100."""
+        for percentage in (0, 1, 10, 15, 33, 100):
+            kernel = _kernel((PERCENTAGE, percentage, None, None, None))
+            for price in (1, 99, 100, 999, 123456789):
+                expected = price * percentage // 100
+                assert kernel(price, 1) == expected
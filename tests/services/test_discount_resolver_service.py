@@ -1,198 +1,380 @@
+import logging
 import pytest
 from unittest.mock import Mock
 from domain.services.discount_resolver_service import (
     DiscountResolverService,
     BestDiscountResolverService,
 )
-from domain.entities.discount import Discount
-from domain.value_objects import CartItem, Money
+from domain.entities.discount import AmountDiscount, Discount, PercentageDiscount
+from domain.entities.discount_condition import (
+    MinQuantityDiscountCondition,
+    ProductCodeDiscountCondition,
+)
+from domain.value_objects import CartItem, Money, Percentage
+from tests.doubles import StubCondition, StubDiscount, TableDiscount
+
+pytestmark = pytest.mark.unit
+
+_D10 = StubDiscount(Money(10, "USD"))
+_D15 = StubDiscount(Money(15, "USD"))
+
+
+class _FirstStubCondition(StubCondition):
+    """Stub condition checked before any built-in condition."""
+
+    estimated_selectivity = 0.0
+
+
+@pytest.fixture(autouse=True)
+def _reset_shared_stubs():
+    """Clear the call logs of the shared stubs after every test."""
+    yield
+    _D10.calls.clear()
+    _D15.calls.clear()
 
 
 class TestDiscountResolverService:
     """Test base DiscountResolverService class."""
 
-    def test_create_with_discounts(self):
+    def test_create_with_discounts(self, make_discount):
         """Test creating service with discount list."""
-        mock_discount1 = Mock(spec=Discount)
-        mock_discount2 = Mock(spec=Discount)
-        service = DiscountResolverService([mock_discount1, mock_discount2])
+        stub_discount1 = make_discount()
+        stub_discount2 = make_discount()
+        service = DiscountResolverService([stub_discount1, stub_discount2])
         assert len(service.discounts) == 2
 
-    def test_calculate_discount_not_implemented(self):
+    def test_calculate_discount_not_implemented(self, cart_item_usd):
         """Test that base class _calculate_discount raises NotImplementedError."""
         service = DiscountResolverService([])
-        cart_item = CartItem("ITEM001", Money(100, "USD"), 1)
         with pytest.raises(NotImplementedError):
-            service._calculate_discount(cart_item)
+            service._calculate_discount(cart_item_usd)
 
-    def test_calculate_discount_caps_at_total_price(self):
+    def test_calculate_discount_caps_at_total_price(self, make_discount):
         """Test that discount is capped at total price."""
-        mock_discount = Mock(spec=Discount)
-        service = BestDiscountResolverService([mock_discount])
-
-        # Mock a discount that returns more than the item price
-        mock_discount.calculate.return_value = Money(500, "USD")
+        # Discount that returns more than the item price
+        service = BestDiscountResolverService([make_discount(500)])
 
         cart_item = CartItem("ITEM001", Money(100, "USD"), 3)  # total: 300 USD
 
         result = service.calculate_discount(cart_item)
 
         # Should be capped at total price (300)
-        assert result.amount == 300
-        assert result.currency == "USD"
+        assert result == Money(300, "USD")
 
-    def test_calculate_discount_below_total_price(self):
+    def test_calculate_discount_below_total_price(self, make_discount):
         """Test discount that is below total price."""
-        mock_discount = Mock(spec=Discount)
-        service = BestDiscountResolverService([mock_discount])
-
-        mock_discount.calculate.return_value = Money(50, "USD")
+        service = BestDiscountResolverService([make_discount(50)])
 
         cart_item = CartItem("ITEM001", Money(100, "USD"), 3)  # total: 300 USD
 
         result = service.calculate_discount(cart_item)
 
-        assert result.amount == 50
-        assert result.currency == "USD"
+        assert result == Money(50, "USD")
+
+    def test_calculate_discounts_returns_discount_per_item(self):
+        """Test that batch calculation returns capped discounts in cart order."""
+        cart_items = [
+            CartItem("ITEM001", Money(100, "USD"), 1),  # total: 100 USD
+            CartItem("ITEM002", Money(100, "USD"), 2),  # total: 200 USD
+            CartItem("ITEM003", Money(100, "USD"), 1),  # no recorded discount
+        ]
+        discount = TableDiscount(
+            {cart_items[0]: Money(150, "USD"), cart_items[1]: Money(120, "USD")}
+        )
+        service = BestDiscountResolverService([discount])
+
+        result = service.calculate_discounts(cart_items)
+
+        assert result == [Money(100, "USD"), Money(120, "USD"), Money(0, "USD")]
+        assert discount.calls == cart_items
 
 
 class TestBestDiscountResolverService:
     """Test BestDiscountResolverService class."""
 
-    def test_create_service(self):
+    def test_create_service(self, make_discount):
         """Test creating BestDiscountResolverService."""
-        mock_discount = Mock(spec=Discount)
-        service = BestDiscountResolverService([mock_discount])
+        service = BestDiscountResolverService([make_discount()])
         assert len(service.discounts) == 1
 
-    def test_calculate_discount_with_no_discounts(self):
+    def test_calculate_discount_with_no_discounts(self, cart_item_usd):
         """Test calculating discount with no discounts returns zero."""
         service = BestDiscountResolverService([])
-        cart_item = CartItem("ITEM001", Money(100, "USD"), 1)
+
+        result = service.calculate_discount(cart_item_usd)
+
+        assert result == Money(0, "USD")
+
+    @pytest.mark.parametrize(
+        "returns,price,quantity,expected",
+        [
+            pytest.param([10], 100, 1, 10, id="single"),
+            pytest.param([10, 25, 15], 100, 1, 25, id="highest-wins"),
+            pytest.param([None, 20, None], 100, 1, 20, id="ignores-none"),
+            pytest.param([None, None], 100, 1, 0, id="all-none"),
+            pytest.param([20, 20], 100, 1, 20, id="equal"),
+            pytest.param([200, 300], 50, 4, 200, id="caps-at-total"),
+        ],
+    )
+    def test_selects_best_discount(
+        self, make_discount, returns, price, quantity, expected
+    ):
+        """Test that the highest discount wins, capped at the item total."""
+        stub_discounts = [make_discount(value) for value in returns]
+
+        service = BestDiscountResolverService(stub_discounts)
+        cart_item = CartItem("ITEM001", Money(price, "USD"), quantity)
 
         result = service.calculate_discount(cart_item)
 
-        assert result.amount == 0
-        assert result.currency == "USD"
+        assert result == Money(expected, "USD")
+        for stub_discount in stub_discounts:
+            assert stub_discount.calls == [cart_item]
 
-    def test_calculate_discount_with_single_discount(self):
-        """Test calculating with single applicable discount."""
+    def test_accepts_mock_discounts(self, cart_item_usd):
+        """Test that any object honouring the Discount interface can be resolved."""
         mock_discount = Mock(spec=Discount)
         mock_discount.calculate.return_value = Money(10, "USD")
 
         service = BestDiscountResolverService([mock_discount])
-        cart_item = CartItem("ITEM001", Money(100, "USD"), 1)
-
-        result = service.calculate_discount(cart_item)
+        result = service.calculate_discount(cart_item_usd)
 
         assert result.amount == 10
-        assert result.currency == "USD"
-        mock_discount.calculate.assert_called_once_with(cart_item)
+        mock_discount.calculate.assert_called_once_with(cart_item_usd)
 
-    def test_selects_best_discount_from_multiple(self):
-        """Test that service selects highest discount from multiple options."""
-        mock_discount1 = Mock(spec=Discount)
-        mock_discount1.calculate.return_value = Money(10, "USD")
+    def test_accepts_duck_typed_discounts(self, cart_item_usd):
+        """Test that objects providing only calculate are treated as unrestricted."""
 
-        mock_discount2 = Mock(spec=Discount)
-        mock_discount2.calculate.return_value = Money(25, "USD")
+        class FixedDiscount:
+            def calculate(self, cart_item):
+                return Money(10, cart_item.price.currency)
 
-        mock_discount3 = Mock(spec=Discount)
-        mock_discount3.calculate.return_value = Money(15, "USD")
+        service = BestDiscountResolverService([FixedDiscount()])
 
-        service = BestDiscountResolverService(
-            [mock_discount1, mock_discount2, mock_discount3]
+        assert service.calculate_discount(cart_item_usd) == Money(10, "USD")
+
+    def test_does_not_index_discounts_with_own_eligibility(self):
+        """Test that a subclass overriding is_eligible is evaluated for every code."""
+
+        class AnyConditionDiscount(AmountDiscount):
+            def is_eligible(self, cart_item):
+                return any(c.is_eligible(cart_item) for c in self.conditions)
+
+        discount = AnyConditionDiscount(
+            Money(10, "EUR"),
+            conditions=[
+                ProductCodeDiscountCondition({"A"}),
+                MinQuantityDiscountCondition(5),
+            ],
         )
-        cart_item = CartItem("ITEM001", Money(100, "USD"), 1)
+        service = BestDiscountResolverService([discount])
 
-        result = service.calculate_discount(cart_item)
+        result = service.calculate_discount(CartItem("B", Money(100, "EUR"), 5))
 
-        assert result.amount == 25
-        assert result.currency == "USD"
+        assert result == Money(10, "EUR")
 
-    def test_ignores_none_discounts(self):
-        """Test that None discounts are ignored."""
-        mock_discount1 = Mock(spec=Discount)
-        mock_discount1.calculate.return_value = None
+    def test_accepts_discount_subclass_without_conditions(self, cart_item_usd):
+        """Test that a subclass not calling Discount.__init__ is unrestricted."""
 
-        mock_discount2 = Mock(spec=Discount)
-        mock_discount2.calculate.return_value = Money(20, "USD")
+        class FixedDiscount(Discount):
+            def __init__(self):
+                pass
 
-        mock_discount3 = Mock(spec=Discount)
-        mock_discount3.calculate.return_value = None
+            def calculate(self, cart_item):
+                return Money(7, cart_item.price.currency)
 
-        service = BestDiscountResolverService(
-            [mock_discount1, mock_discount2, mock_discount3]
-        )
-        cart_item = CartItem("ITEM001", Money(100, "USD"), 1)
+        service = BestDiscountResolverService([FixedDiscount()])
 
-        result = service.calculate_discount(cart_item)
+        assert service.calculate_discount(cart_item_usd) == Money(7, "USD")
 
-        assert result.amount == 20
-        assert result.currency == "USD"
+    def test_calls_all_discount_calculations(self, cart_item_usd):
+        """Test that all discount calculations are called."""
+        service = BestDiscountResolverService([_D10, _D15])
 
-    def test_all_discounts_none_returns_zero(self):
-        """Test that all None discounts returns zero."""
-        mock_discount1 = Mock(spec=Discount)
-        mock_discount1.calculate.return_value = None
+        service.calculate_discount(cart_item_usd)
 
-        mock_discount2 = Mock(spec=Discount)
-        mock_discount2.calculate.return_value = None
+        assert _D10.calls == [cart_item_usd]
+        assert _D15.calls == [cart_item_usd]
 
-        service = BestDiscountResolverService([mock_discount1, mock_discount2])
-        cart_item = CartItem("ITEM001", Money(100, "USD"), 1)
+    def test_ignores_amount_discounts_in_other_currency(self):
+        """Test that fixed discounts only apply to items in their currency."""
+        service = BestDiscountResolverService(
+            [
+                AmountDiscount(Money(50, "EUR"), conditions=None),
+                PercentageDiscount(Percentage(10), conditions=None),
+            ]
+        )
 
-        result = service.calculate_discount(cart_item)
+        usd_result = service.calculate_discount(
+            CartItem("ITEM001", Money(100, "USD"), 1)
+        )
+        eur_result = service.calculate_discount(
+            CartItem("ITEM001", Money(100, "EUR"), 1)
+        )
 
-        assert result.amount == 0
-        assert result.currency == "USD"
+        assert usd_result == Money(10, "USD")
+        assert eur_result == Money(50, "EUR")
 
-    def test_equal_discounts_returns_first_found(self):
-        """Test behavior when multiple discounts have equal value."""
-        mock_discount1 = Mock(spec=Discount)
-        mock_discount1.calculate.return_value = Money(20, "USD")
+    def test_skips_discounts_restricted_to_other_product_codes(self, cart_item_usd):
+        """Test that code-restricted discounts are only evaluated for their codes."""
+        item001_probe = _FirstStubCondition(True)
+        item002_probe = _FirstStubCondition(True)
+        service = BestDiscountResolverService(
+            [
+                AmountDiscount(
+                    Money(30, "USD"),
+                    conditions=[
+                        ProductCodeDiscountCondition({"ITEM001"}),
+                        ProductCodeDiscountCondition({"ITEM001", "ITEM002"}),
+                        item001_probe,
+                    ],
+                ),
+                AmountDiscount(
+                    Money(50, "USD"),
+                    conditions=[
+                        ProductCodeDiscountCondition({"ITEM002"}),
+                        item002_probe,
+                    ],
+                ),
+                _D10,
+            ]
+        )
 
-        mock_discount2 = Mock(spec=Discount)
-        mock_discount2.calculate.return_value = Money(20, "USD")
+        result = service.calculate_discount(cart_item_usd)
 
-        service = BestDiscountResolverService([mock_discount1, mock_discount2])
-        cart_item = CartItem("ITEM001", Money(100, "USD"), 1)
+        assert result.amount == 30
+        assert item001_probe.calls == [cart_item_usd]
+        assert item002_probe.calls == []
+        assert _D10.calls == [cart_item_usd]
 
-        result = service.calculate_discount(cart_item)
+    def test_repeated_items_are_resolved_once(self):
+        """Test that identical cart lines reuse the memoized discount."""
+        service = BestDiscountResolverService([_D10])
+        first = CartItem("ITEM001", Money(100, "USD"), 1)
+        second = CartItem("ITEM001", Money(100, "USD"), 1)
 
-        # Should return 20 (both are equal, implementation picks first one matched)
-        assert result.amount == 20
-        assert result.currency == "USD"
+        service.calculate_discount(first)
+        result = service.calculate_discount(second)
 
-    def test_calls_all_discount_calculations(self):
-        """Test that all discount calculations are called."""
-        mock_discount1 = Mock(spec=Discount)
-        mock_discount1.calculate.return_value = Money(10, "USD")
+        assert result.amount == 10
+        assert _D10.calls == [first]
+
+    def test_different_quantity_is_resolved_separately(self):
+        """Test that cart lines differing in quantity are not shared."""
+        service = BestDiscountResolverService([_D10])
+        service.calculate_discount(CartItem("ITEM001", Money(100, "USD"), 1))
+        service.calculate_discount(CartItem("ITEM001", Money(100, "USD"), 2))
 
-        mock_discount2 = Mock(spec=Discount)
-        mock_discount2.calculate.return_value = Money(15, "USD")
+        assert len(_D10.calls) == 2
 
-        service = BestDiscountResolverService([mock_discount1, mock_discount2])
-        cart_item = CartItem("ITEM001", Money(100, "USD"), 1)
+    def test_cache_evicts_oldest_entry_when_full(self):
+        """Test that the memo cache never grows beyond cache_size."""
+        service = BestDiscountResolverService([_D10])
+        service.cache_size = 2
+        for quantity in range(1, 4):
+            service.calculate_discount(CartItem("ITEM001", Money(100, "USD"), quantity))
 
+        assert len(service._cache) == 2
+        assert CartItem("ITEM001", Money(100, "USD"), 1) not in service._cache
+
+    def test_replacing_discounts_clears_cache(self):
+        """Test that assigning new discounts resets the resolved values."""
+        service = BestDiscountResolverService(
+            [AmountDiscount(Money(5, "EUR"), conditions=None)]
+        )
+        cart_item = CartItem("ITEM001", Money(100, "EUR"), 1)
         service.calculate_discount(cart_item)
 
-        mock_discount1.calculate.assert_called_once_with(cart_item)
-        mock_discount2.calculate.assert_called_once_with(cart_item)
+        service.discounts = [AmountDiscount(Money(50, "EUR"), conditions=None)]
+
+        assert isinstance(service.discounts, tuple)
+        assert service.calculate_discount(cart_item) == Money(50, "EUR")
 
-    def test_best_discount_capped_at_total_price(self):
-        """Test that best discount is capped at cart item total price."""
-        mock_discount1 = Mock(spec=Discount)
-        mock_discount1.calculate.return_value = Money(200, "USD")
+    def test_drops_dominated_discounts(self):
+        """Test that discounts beaten by an unconditional one are not evaluated."""
+        dominated_probe = _FirstStubCondition(True)
+        service = BestDiscountResolverService(
+            [
+                PercentageDiscount(Percentage(20), conditions=None),
+                PercentageDiscount(Percentage(30), conditions=None),
+                PercentageDiscount(Percentage(30), conditions=None),
+                PercentageDiscount(
+                    Percentage(25),
+                    conditions=[MinQuantityDiscountCondition(2), dominated_probe],
+                ),
+                AmountDiscount(Money(10, "USD"), conditions=None),
+                AmountDiscount(Money(10, "EUR"), conditions=None),
+            ]
+        )
 
-        mock_discount2 = Mock(spec=Discount)
-        mock_discount2.calculate.return_value = Money(300, "USD")
+        result = service.calculate_discount(CartItem("ITEM001", Money(100, "USD"), 2))
 
-        service = BestDiscountResolverService([mock_discount1, mock_discount2])
-        cart_item = CartItem("ITEM001", Money(50, "USD"), 4)  # total: 200 USD
+        assert len(service.discounts) == 6
+        assert dominated_probe.calls == []
+        assert result.amount == 30
+
+    def test_keeps_conditional_discounts_above_unconditional_best(self):
+        """Test that a conditional discount that can still win is kept."""
+        kept_probe = _FirstStubCondition(True)
+        service = BestDiscountResolverService(
+            [
+                AmountDiscount(Money(10, "USD"), conditions=None),
+                AmountDiscount(
+                    Money(50, "USD"),
+                    conditions=[MinQuantityDiscountCondition(2), kept_probe],
+                ),
+            ]
+        )
+        cart_item = CartItem("ITEM001", Money(100, "USD"), 2)
 
         result = service.calculate_discount(cart_item)
 
-        # Best discount is 300, but should be capped at total price of 200
-        assert result.amount == 200
-        assert result.currency == "USD"
+        assert kept_probe.calls == [cart_item]
+        assert result.amount == 50
+
+    def test_keeps_conditional_amount_just_above_unconditional_best(self):
+        """Test that a conditional amount one above the best, listed after it, wins."""
+        service = BestDiscountResolverService(
+            [
+                AmountDiscount(Money(100, "EUR"), conditions=None),
+                AmountDiscount(
+                    Money(101, "EUR"), conditions=[MinQuantityDiscountCondition(2)]
+                ),
+            ]
+        )
+
+        result = service.calculate_discount(CartItem("ITEM001", Money(500, "EUR"), 2))
+
+        assert result == Money(101, "EUR")
+
+    @pytest.mark.parametrize("conditional_percentage", [96, 95.5])
+    def test_keeps_conditional_percentage_just_above_unconditional_best(
+        self, conditional_percentage
+    ):
+        """Test that a conditional percentage just above the best, listed after it, wins."""
+        service = BestDiscountResolverService(
+            [
+                PercentageDiscount(Percentage(95), conditions=None),
+                PercentageDiscount(
+                    Percentage(conditional_percentage),
+                    conditions=[ProductCodeDiscountCondition({"C"})],
+                ),
+            ]
+        )
+
+        result = service.calculate_discount(CartItem("C", Money(1000, "USD"), 1))
+
+        assert result.amount == 1000 * conditional_percentage // 100
+
+    def test_logs_dropped_discounts(self, caplog):
+        """Test that dropped discounts are reported at debug level."""
+        dominated = AmountDiscount(Money(5, "USD"), conditions=None)
+
+        with caplog.at_level(logging.DEBUG):
+            BestDiscountResolverService(
+                [AmountDiscount(Money(10, "USD"), conditions=None), dominated]
+            )
+
+        assert caplog.records[0].getMessage() == (
+            "Dropping dominated AmountDiscount of 5 (currency: USD)"
+        )
@@ -1,26 +1,38 @@
+import re
+import sys
 import pytest
-from domain.value_objects import Money, Percentage
+from domain.value_objects import CartItem, Money, Percentage
 
+pytestmark = pytest.mark.unit
 
+_PERCENT_ERR = re.compile(r"percentage has to be a float value between 0 and 100")
+_CURRENCY_ERR = re.compile(r"Cannot add Money with different currencies")
+
+
+@pytest.mark.fast
 class TestMoney:
     """Test Money value object."""
 
-    def test_immutability(self, usd_money):
-        """Test that Money is immutable."""
-        with pytest.raises(AttributeError):
-            usd_money.amount = 200
+    def test_has_no_instance_dict(self, usd_money):
+        """Test that Money uses slots instead of a per-instance dict."""
+        assert not hasattr(usd_money, "__dict__")
 
-    def test_add_same_currency(self, usd_money, small_usd_money):
-        """Test adding Money objects with same currency."""
-        result = usd_money + small_usd_money
-        assert result.amount == 110
-        assert result.currency == "USD"
+    def test_currency_is_interned(self):
+        """Test that currency codes are interned for identity comparisons."""
+        money = Money(100, b"USD".decode())
+        assert money.currency is sys.intern("USD")
+
+    def test_equality_compares_amount_and_currency(self, usd_money):
+        """Test that Money objects are equal when amount and currency match."""
+        assert usd_money == Money(100, "USD")
+        assert hash(usd_money) == hash(Money(100, "USD"))
+        assert usd_money != Money(100, "EUR")
+        assert usd_money != Money(10, "USD")
+        assert usd_money != 100
 
     def test_add_different_currency_raises_error(self, usd_money, eur_money):
         """Test that adding different currencies raises ValueError."""
-        with pytest.raises(
-            ValueError, match="Cannot add Money with different currencies"
-        ):
+        with pytest.raises(ValueError, match=_CURRENCY_ERR):
             usd_money + eur_money
 
     def test_add_non_money_returns_not_implemented(self, usd_money):
@@ -28,51 +40,86 @@ class TestMoney:
         result = usd_money.__add__("invalid")
         assert result is NotImplemented
 
-    def test_radd_with_money_object(self, usd_money, small_usd_money):
-        """Test __radd__ with Money object (reverse addition)."""
-        result = usd_money.__radd__(small_usd_money)
-        assert result.amount == 110
+    @pytest.mark.parametrize(
+        "operation,expected",
+        [
+            ("add", 110),
+            ("radd", 110),
+            ("sum", 160),
+        ],
+    )
+    def test_addition(self, usd_money, small_usd_money, operation, expected):
+        """Test +, reverse addition and sum() of same-currency Money objects."""
+        if operation == "add":
+            result = usd_money + small_usd_money
+        elif operation == "radd":
+            result = usd_money.__radd__(small_usd_money)
+        else:
+            result = sum([usd_money, small_usd_money, Money(50, "USD")])
+
+        assert result.amount == expected
         assert result.currency == "USD"
 
-    def test_sum_with_list_of_money(self, usd_money, small_usd_money):
-        """Test using sum() with list of Money objects."""
-        total = sum([usd_money, small_usd_money, Money(50, "USD")])
-        assert total.amount == 160
-        assert total.currency == "USD"
-
 
+@pytest.mark.fast
 class TestPercentage:
     """Test Percentage value object."""
 
-    def test_immutability(self, percentage_50):
-        """Test that Percentage is immutable."""
-        with pytest.raises(AttributeError):
-            percentage_50.percentage = 75
+    def test_has_no_instance_dict(self, percentage_50):
+        """Test that Percentage uses slots instead of a per-instance dict."""
+        assert not hasattr(percentage_50, "__dict__")
+
+    @pytest.mark.parametrize(
+        "value,raises",
+        [
+            (-1, True),
+            (-0.001, True),
+            (101, True),
+            (1000, True),
+            (0, False),
+            (100, False),
+            (50.5, False),
+        ],
+    )
+    def test_percentage_validation(self, value, raises):
+        """Test that only values between 0 and 100 inclusive are accepted."""
+        if raises:
+            with pytest.raises(ValueError, match=_PERCENT_ERR):
+                Percentage(value)
+        else:
+            assert Percentage(value).percentage == value
+
+
+@pytest.mark.fast
+class TestCartItem:
+    """Test CartItem value object."""
 
-    def test_percentage_below_zero_raises_error(self):
-        """Test that percentage below 0 raises ValueError."""
-        with pytest.raises(
-            ValueError, match="percentage has to be a float value between 0 and 100"
-        ):
-            Percentage(-1)
+    def test_has_no_instance_dict(self, cart_item_multiple_quantity):
+        """Test that CartItem uses slots instead of a per-instance dict."""
+        assert not hasattr(cart_item_multiple_quantity, "__dict__")
 
-    def test_percentage_above_hundred_raises_error(self):
-        """Test that percentage above 100 raises ValueError."""
-        with pytest.raises(
-            ValueError, match="percentage has to be a float value between 0 and 100"
-        ):
-            Percentage(101)
+    def test_code_is_interned(self):
+        """Test that product codes are interned for identity comparisons."""
+        cart_item = CartItem(b"ITEM001".decode(), Money(100, "USD"), 1)
+        assert cart_item.code is sys.intern("ITEM001")
 
+    def test_equal_when_line_matches(self):
+        """Test that cart items with the same line data are equal and hash equal."""
+        item = CartItem("ITEM001", Money(100, "USD"), 2)
+        same = CartItem("ITEM001", Money(100, "USD"), 2)
 
-class TestCartItem:
-    """Test CartItem value object."""
+        assert item == same
+        assert hash(item) == hash(same)
 
-    def test_immutability(self, cart_item_multiple_quantity):
-        """Test that CartItem is immutable."""
-        with pytest.raises(AttributeError):
-            cart_item_multiple_quantity.code = "ITEM002"
-        with pytest.raises(AttributeError):
-            cart_item_multiple_quantity.quantity = 5
+    def test_not_equal_when_line_differs(self):
+        """Test that any differing field makes cart items unequal."""
+        item = CartItem("ITEM001", Money(100, "USD"), 2)
+
+        assert item != CartItem("ITEM002", Money(100, "USD"), 2)
+        assert item != CartItem("ITEM001", Money(200, "USD"), 2)
+        assert item != CartItem("ITEM001", Money(100, "EUR"), 2)
+        assert item != CartItem("ITEM001", Money(100, "USD"), 3)
+        assert item != "ITEM001"
 
     def test_total_price_calculation(self, cart_item_multiple_quantity):
         """Test total_price calculation."""
@@ -80,8 +127,39 @@ class TestCartItem:
         assert total.amount == 300
         assert total.currency == "USD"
 
+    def test_total_amount_matches_total_price(self, cart_item_multiple_quantity):
+        """Test that total_amount is the raw total price amount."""
+        assert cart_item_multiple_quantity.total_amount == 300
+
     def test_total_price_preserves_currency(self, cart_item_eur):
         """Test that total_price preserves currency."""
         total = cart_item_eur.total_price
         assert total.amount == 100
         assert total.currency == "EUR"
+
+    def test_total_price_is_computed_once(self, cart_item_multiple_quantity):
+        """Test that total_price returns the same precomputed instance."""
+        assert (
+            cart_item_multiple_quantity.total_price
+            is cart_item_multiple_quantity.total_price
+        )
+
+
+@pytest.mark.fast
+class TestImmutability:
+    """Test that value objects reject attribute assignment."""
+
+    @pytest.mark.parametrize(
+        "obj_fixture,attr,value",
+        [
+            ("usd_money", "amount", 200),
+            ("percentage_50", "percentage", 75),
+            ("cart_item_multiple_quantity", "code", "ITEM002"),
+            ("cart_item_multiple_quantity", "quantity", 5),
+        ],
+    )
+    def test_immutability(self, request, obj_fixture, attr, value):
+        """Test that public attributes of value objects cannot be set."""
+        obj = request.getfixturevalue(obj_fixture)
+        with pytest.raises(AttributeError):
+            setattr(obj, attr, value)